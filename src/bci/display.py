@@ -18,7 +18,7 @@ from PIL import ImageTk
 from pynput import keyboard
 
 from bci.graphics import Graphics
-from bci.neopixel import Color, NeoPixel
+from bci.neopixel import NeoPixel
 
 # from rpi_ws281x import Adafruit_NeoPixel
 
@@ -87,6 +87,7 @@ class InternalDisplay(_Display):
     _graphics: The graphics to be shown.
     _frame: The window of the display.
     _panel: The panel of the display to show the graphics.
+    _photo: The image shown in the panel.
   """
 
   def __init__(self, width: int, height: int) -> None:
@@ -104,6 +105,7 @@ class InternalDisplay(_Display):
     self._frame = Tk()
     self._frame.geometry(f'{self.width}x{self.height}')
     self._panel = None
+    self._photo = None
 
   def _bind_events(self) -> None:
     """ Binds the events of the display.
@@ -127,9 +129,8 @@ class InternalDisplay(_Display):
     self._bind_events()
     self._frame.title(graphics.get_filename())
 
-    photo_image = ImageTk.PhotoImage(graphics.get_view())
-    self._panel = Label(image=photo_image)
-    self._panel.image = photo_image
+    self._photo = ImageTk.PhotoImage(graphics.get_view())
+    self._panel = Label(image=self._photo)
     self._panel.pack(side='bottom', fill='both', expand='yes')
 
     self._frame.mainloop()
@@ -143,9 +144,9 @@ class InternalDisplay(_Display):
     if self._panel is None:
       raise ValueError('Panel is not initialized.')
 
-    photo_image = ImageTk.PhotoImage(self._graphics.get_view())
-    self._panel.configure(image=photo_image)
-    self._panel.image = photo_image
+    # Zooming keeps the size of the view, so its pixels are pasted into the
+    # image already shown by the panel.
+    self._photo.paste(self._graphics.get_view())
 
 
 class ExternalDisplay(_Display):
@@ -159,14 +160,20 @@ class ExternalDisplay(_Display):
     _graphics: The graphics to be shown.
     _frame: The LED matrix.
     _display_config: The display configuration.
+    _write_ppm: If the graphics shown should also be saved as a ppm file.
   """
 
-  def __init__(self, config_path: str = 'settings/led_matrix.toml') -> None:
+  def __init__(self,
+               config_path: str = 'settings/led_matrix.toml',
+               write_ppm: bool = False) -> None:
     """ Initializes the External Display.
     
     Args:
       config_path: The path of the configuration file.
+      write_ppm: If True, saves the graphics as a ppm file whenever the display
+        is drawn.
     """
+    self._write_ppm: bool = write_ppm
     self._load_config(config_path)
     super().__init__(self._display_config.width_count,
                      self._display_config.height_count)
@@ -213,28 +220,26 @@ class ExternalDisplay(_Display):
     """
     self._graphics = graphics
 
+    # Flattening first lets the downscale average colors that are already
+    # composited over black, and keeps it on three bands.
+    self._graphics.flatten(inplace=True)
     self._graphics.resize(self.width,
                           self.height,
                           keep_aspect_ratio=True,
-                          inplace=True)
+                          inplace=True,
+                          backend='cv2')
 
-    self._graphics.to_ppm()
-
-    pixels = self._graphics.get_pixels()
-    for i in range(self._frame.numPixels()):
-      self._frame.setPixelColor(i,
-                                Color(pixels[i][0], pixels[i][1], pixels[i][2]))
-
-    self._frame.show()
+    self.update()
     self._bind_events()
 
   def _bind_events(self) -> None:
     """ Binds the events of the display."""
+    listener = keyboard.Listener(on_press=self._on_press)
+    listener.start()
     try:
-      while True:
-        with keyboard.Listener(on_press=self._on_press) as listener:
-          listener.join()
+      listener.join()
     except KeyboardInterrupt:
+      listener.stop()
       print('Finalizando...')
 
   def _on_press(self, key):
@@ -246,19 +251,15 @@ class ExternalDisplay(_Display):
     try:
       if key.char == '+':
         self.add_zoom()
-        self.update()
       elif key.char == '-':
         self.add_zoom(zoom_out=True)
-        self.update()
     except AttributeError:
       pass
 
   def update(self) -> None:
     """ Updates the display."""
-    pixels = self._graphics.get_pixels()
-    for i in range(self._frame.numPixels()):
-      self._frame.setPixelColor(i,
-                                Color(pixels[i][0], pixels[i][1], pixels[i][2]))
+    self._frame.setBuffer(self._graphics.get_rgb())
 
     self._frame.show()
-    self._graphics.to_ppm()
+    if self._write_ppm:
+      self._graphics.to_ppm()
@@ -5,11 +5,69 @@ manipulating images.
 """
 
 from PIL import Image
+from collections import OrderedDict
 from pathlib import Path
 import errno
 import os
 import numpy as np
 
+# How many zoomed views are kept, enough to bounce between neighbouring zoom
+# levels.
+_ZOOM_VIEWS_LIMIT = 3
+
+# Every 8-bit value as a fixed-width "VVV " ppm field, right aligned.
+_FIELDS = np.frombuffer(b''.join(f'{i:>3} '.encode() for i in range(256)),
+                        dtype=np.uint8).reshape(256, 4)
+
+
+def _flatten(image: Image) -> Image:
+  """ Composites an image over a black background.
+
+  Args:
+    image: The RGBA image to be flattened.
+
+  Returns:
+    The flattened RGB image.
+  """
+  background = Image.new('RGBA', image.size, (0, 0, 0, 255))
+  return Image.alpha_composite(background, image).convert('RGB')
+
+
+def _cv2_resize(pixels: np.ndarray, size: tuple) -> np.ndarray:
+  """ Resizes RGB pixels with OpenCV using area interpolation.
+
+  Args:
+    pixels: The (height, width, 3) uint8 pixels.
+    size: The (width, height) to resize to.
+
+  Returns:
+    The resized uint8 pixels.
+  """
+  # OpenCV is only needed by this backend, so it is imported on first use.
+  import cv2
+
+  return cv2.resize(pixels, size, interpolation=cv2.INTER_AREA)
+
+
+def _ppm_bytes(rgb: np.ndarray, header: bytes = b'') -> bytes:
+  """ Formats pixels as a plain ppm file.
+
+  Every pixel is written as a fixed-width "RRR GGG BBB" line, looked up from a
+  table instead of converting each value to text. The lines are written right
+  after the header into a single preallocated buffer.
+
+  Args:
+    rgb: The (N, 3) uint8 pixels.
+    header: The ppm header to be written before the pixels.
+  """
+  buffer = np.empty(len(header) + len(rgb) * 12, dtype=np.uint8)
+  buffer[:len(header)] = np.frombuffer(header, dtype=np.uint8)
+
+  lines = buffer[len(header):].reshape(-1, 12)
+  np.take(_FIELDS, rgb, axis=0, out=lines.reshape(-1, 3, 4))
+  lines[:, -1] = ord('\n')
+  return buffer.tobytes()
+
 
 class Graphics:
   """ Graphics class.
@@ -22,36 +80,65 @@ class Graphics:
     width: The width of the image.
     height: The height of the image.
     _transformations: The transformations applied to the image.
+    _dirty: If the image to be shown changed since its pixels were cached.
+    _pixels_cache: The cached pixels of the image to be shown.
+    _rgb_cache: The cached RGB pixels of the image to be shown.
+    _zoom_views: The views most recently zoomed from the image, keyed by zoom
+      level, center and size.
   
   """
 
-  def __init__(self, asset_path: str) -> None:
+  def __init__(self, asset_path: str, target_size: tuple = None) -> None:
     """ Initializes the graphics object.
     
     Args:
       asset_path: The path to the image.
+      target_size: The (width, height) the image is going to be shown at, if
+        known in advance. Used to decode the image at a reduced scale.
     """
     self._path: str = Path(asset_path)
-    self._initialize(asset_path)
+    self._initialize(target_size)
 
-  def _initialize(self, asset_path: str) -> None:
+  def _initialize(self, target_size: tuple = None) -> None:
     """ Initializes the graphics object.
 
     Args:
-      asset_path: The path to the image.
+      target_size: The (width, height) the image is going to be shown at.
 
     Raises:
       FileNotFoundError: If the file is not found.
     """
     if not self._path.exists():
       raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT),
-                              asset_path)
+                              str(self._path))
 
-    self.image: Image = Image.open(asset_path)
-    self._view: Image = self.image.copy()
+    self.image: Image = self._open(target_size)
+    self._view: Image = self.image
     self.width: int = self._view.width
     self.height: int = self._view.height
     self._transformations: dict = {'zoom': 1}
+    self._dirty: bool = True
+    self._pixels_cache: np.ndarray = None
+    self._rgb_cache: np.ndarray = None
+    self._zoom_views: OrderedDict = OrderedDict()
+
+  def _open(self, target_size: tuple = None) -> Image:
+    """ Opens the image as RGBA.
+
+    If a target size is given, formats that support it (such as JPEG) are
+    decoded at the smallest scale still at least twice as large as the target.
+
+    Args:
+      target_size: The (width, height) the image is going to be shown at.
+    """
+    image = Image.open(self._path)
+    if target_size is not None:
+      width, height = target_size
+      image.draft(image.mode, (width * 2, height * 2))
+
+    if image.mode != 'RGBA':
+      image = image.convert('RGBA')
+    return image
 
   def get_view(self) -> Image:
     """Returns the image to be shown."""
@@ -72,9 +159,39 @@ class Graphics:
     """ Returns the filename of the image."""
     return self._path.name
 
-  def get_pixels(self):
-    """ Returns the pixels of the image."""
-    return np.array(self.get_view().getdata())
+  def get_pixels(self) -> np.ndarray:
+    """ Returns the pixels of the image as a (width * height, bands) array.
+
+    The image has four RGBA bands, or three RGB bands once flattened. The
+    pixels are computed once per view and cached until the next
+    transformation.
+    """
+    if self._dirty:
+      self._cache_pixels(np.asarray(self._view))
+    return self._pixels_cache
+
+  def get_rgb(self) -> np.ndarray:
+    """ Returns the RGB pixels of the image as a (width * height, 3) array.
+
+    The array is contiguous and cached along with the pixels returned by
+    get_pixels.
+    """
+    self.get_pixels()
+    return self._rgb_cache
+
+  def _cache_pixels(self, pixels: np.ndarray) -> None:
+    """ Caches the pixels of the image to be shown.
+
+    Args:
+      pixels: The (height, width, bands) pixels of the image to be shown.
+    """
+    self._pixels_cache = pixels.reshape(-1, pixels.shape[-1])
+    self._rgb_cache = np.ascontiguousarray(self._pixels_cache[:, :3])
+    self._dirty = False
+
+  def _invalidate(self) -> None:
+    """ Marks the cached pixels of the image to be shown as outdated."""
+    self._dirty = True
 
   def crop(self,
            width: int,
@@ -99,13 +216,17 @@ class Graphics:
     else:
       self.image = self.image.crop(
           (x - width, y - height, x + width, y + height))
-      self._view = self.image.copy()
+      self._view = self.image
+      self._zoom_views.clear()
+    self._invalidate()
 
   def resize(self,
              width: int,
              height: int,
              keep_aspect_ratio: bool = False,
-             inplace: bool = False) -> None:
+             inplace: bool = False,
+             resample: int = Image.Resampling.BILINEAR,
+             backend: str = 'pil') -> None:
     """ Resizes the image.
 
     Args:
@@ -114,7 +235,25 @@ class Graphics:
       keep_aspect_ratio: If True, keeps the aspect ratio of the image.
       inplace: If True, resizes the original image. Otherwise, resizes the image
         to be shown.
+      resample: The resampling filter to be used. It is ignored if backend is
+        'cv2'.
+      backend: The library used to resize, either 'pil' or 'cv2'. The 'cv2'
+        backend uses area interpolation, which is well suited for downscaling,
+        and requires OpenCV to be installed. It only takes RGB images, since
+        OpenCV does not premultiply alpha, so RGBA images must be flattened
+        first.
+
+    Raises:
+      ValueError: If the backend is not supported, or if the 'cv2' backend is
+        used on an image that is not RGB.
     """
+    if backend not in ('pil', 'cv2'):
+      raise ValueError(f'Unsupported resize backend: {backend}')
+
+    source = self._view if not inplace else self.image
+    if backend == 'cv2' and source.mode != 'RGB':
+      raise ValueError('The cv2 backend only resizes RGB images.')
+
     aspect_ratio = width / height
 
     if keep_aspect_ratio:
@@ -137,14 +276,29 @@ class Graphics:
       self.crop(int(crop_width), int(crop_height), self.width / 2,
                 self.height / 2, inplace)
 
-    if not inplace:
-      self._view = self._view.resize((width, height))
+    if backend == 'cv2':
+      source = self._view if not inplace else self.image
+      pixels = _cv2_resize(np.asarray(source), (width, height))
+      self._view = Image.fromarray(pixels)
+      if inplace:
+        self.image = self._view
+        self._zoom_views.clear()
+    elif not inplace:
+      self._view = self._view.resize((width, height), resample)
     else:
-      self.image = self.image.resize((width, height))
-      self._view = self._view.resize((width, height))
+      self.image = self.image.resize((width, height), resample)
+      self._view = self.image
+      self._zoom_views.clear()
     self.width = width
     self.height = height
 
+    if backend == 'cv2':
+      # The resized pixels are already at hand, so there is no need to export
+      # them back from the new view.
+      self._cache_pixels(pixels)
+    else:
+      self._invalidate()
+
   def zoom(self,
            zoom: int = 2,
            center: bool = True,
@@ -172,9 +326,50 @@ class Graphics:
 
     self._transformations['zoom'] *= zoom
 
-    self.crop(self.width / zoom2, self.height / zoom2, x, y)
+    key = (self._transformations['zoom'], x, y, self.width, self.height)
+    if key in self._zoom_views:
+      self._zoom_views.move_to_end(key)
+      self._view = self._zoom_views[key]
+      self._invalidate()
+      return
+
+    left = x - self.width / zoom2
+    upper = y - self.height / zoom2
+    right = x + self.width / zoom2
+    lower = y + self.height / zoom2
+
+    if (left < 0 or upper < 0 or right > self.image.width or
+        lower > self.image.height):
+      # Pillow only resizes regions inside the image, so zooming out past its
+      # borders still needs the padded crop.
+      self.crop(self.width / zoom2, self.height / zoom2, x, y)
+      self.resize(self.width, self.height)
+    else:
+      self._view = self.image.resize((self.width, self.height),
+                                     Image.Resampling.BILINEAR,
+                                     box=(left, upper, right, lower))
+      self._invalidate()
 
-    self.resize(self.width, self.height)
+    self._zoom_views[key] = self._view
+    if len(self._zoom_views) > _ZOOM_VIEWS_LIMIT:
+      self._zoom_views.popitem(last=False)
+
+  def flatten(self, inplace: bool = False) -> None:
+    """ Flattens the transparency of the image over a black background.
+
+    The image becomes an RGB image, so its pixels no longer carry an alpha band.
+
+    Args:
+      inplace: If True, flattens the original image. Otherwise, flattens the
+        image to be shown.
+    """
+    if not inplace:
+      self._view = _flatten(self._view)
+    else:
+      self.image = _flatten(self.image)
+      self._view = self.image
+      self._zoom_views.clear()
+    self._invalidate()
 
   def to_ppm(self, path: str = 'assets/pixels.ppm') -> None:
     """ Saves the image as a ppm file.
@@ -184,11 +379,12 @@ class Graphics:
     """
     file = Path(path)
 
-    with file.open(mode='w', encoding='utf-8') as f:
-      f.write(f'P3\n{self.width} {self.height}\n255\n')
+    if self._view.mode == 'RGB':
+      rgb = self.get_rgb()
+    else:
+      rgb = np.asarray(_flatten(self._view)).reshape(-1, 3)
+
+    header = f'P3\n{self.width} {self.height}\n255\n'.encode()
 
-      for pixel in self.get_pixels():
-        if pixel[3] == 0:
-          f.write('0 0 0\n')
-        else:
-          f.write(f'{pixel[0]} {pixel[1]} {pixel[2]}\n')
+    with file.open(mode='wb') as f:
+      f.write(_ppm_bytes(rgb, header))
@@ -1,14 +1,10 @@
 ## SIMULATING THE MATRIX
 
-import numpy as np
-
+from collections import namedtuple
 
-class Color:
+import numpy as np
 
-  def __init__(self, red, green, blue):
-    self.red = red
-    self.green = green
-    self.blue = blue
+Color = namedtuple('Color', ['red', 'green', 'blue'])
 
 
 class NeoPixel:
@@ -27,20 +23,34 @@ class NeoPixel:
     self.led_dma = led_dma
     self.led_invert = led_invert
 
-    self._pixels = np.zeros(led_count, dtype=Color)
+    self._pixels = np.zeros((led_count, 3), dtype=np.uint8)
 
   def begin(self):
     pass
 
   def setPixelColor(self, index, color):
+    # Color is a tuple, so it is stored like any (red, green, blue) sequence.
     self._pixels[index] = color
 
+  def setPixelColorRGB(self, index, red, green, blue):
+    self._pixels[index] = (red, green, blue)
+
+  def setBuffer(self, rgb):
+    self._pixels[:] = rgb[:self.led_count]
+
+  def applyGamma(self, table):
+    # table maps each of the 256 channel values to its corrected value.
+    self._pixels[:] = np.asarray(table, dtype=np.uint8)[self._pixels]
+
+  def getBuffer(self):
+    # C-contiguous (led_count, 3) RGB bytes, ready to be handed to a driver
+    # without copying.
+    return memoryview(self._pixels)
+
   def show(self):
     pass
-    # for i in range(self.led_count):
-    #   print(
-    #       f'{i}: {self._pixels[i].red}, {self._pixels[i].green}, {self._pixels[i].blue}'
-    #   )
+    # for i, (red, green, blue) in enumerate(self._pixels):
+    #   print(f'{i}: {red}, {green}, {blue}')
 
   def numPixels(self):
     return self.led_count
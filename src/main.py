@@ -9,11 +9,12 @@ if __name__ == '__main__':
   image_path = 'assets/ghost.png'
   # image_path = 'assets/pacman.jpg'
 
-  image = Graphics(image_path)
   if display_type == 'internal':
+    image = Graphics(image_path)
     width, height = image.get_dimensions()
     display = InternalDisplay(width, height)
     display.show(image)
   else:
     display = ExternalDisplay()
+    image = Graphics(image_path, (display.width, display.height))
     display.show(image)